@@ -1,11 +1,154 @@
 import hashlib
+import importlib
 import json
+import multiprocessing
+import os
+import queue
+import sys
 import time
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import orjson
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from pathlib import Path
 
+try:
+    from ETL_Pipeline.ledger import extraction_hashes_by_name, is_json_array
+except ImportError:  # run as a script from Blockchain/
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from ETL_Pipeline.ledger import extraction_hashes_by_name, is_json_array
+
+# Nonces tried per call into a specialised search loop
+_SEARCH_BATCH = 4096
+
+# Validation hashes on a thread pool once at least this many blocks can use it
+_PARALLEL_VALIDATION_MIN_BLOCKS = 64
+
+# hashlib only releases the GIL for inputs larger than this
+_GIL_RELEASE_BYTES = 2048
+
+def _optional_miner(module: str, feature: str, requirement: str):
+    """`mine` from an optional proof-of-work backend, imported only when that backend is used"""
+    name = f"{__package__}.{module}" if __package__ else module
+    try:
+        return importlib.import_module(name).mine
+    except ImportError as e:
+        raise RuntimeError(f"{feature} requires {requirement}") from e
+
+def _check_difficulty(difficulty: int):
+    """Reject difficulties outside what a 64-hex-digit SHA-256 digest can meet"""
+    if not 0 <= difficulty <= 64:
+        raise ValueError("difficulty must be between 0 and 64")
+
+@lru_cache(maxsize=None)
+def _specialized_search(difficulty: int) -> Callable[[Any, bytes, int, int, int], Optional[Tuple[int, str]]]:
+    """Nonce loop generated for one difficulty, with its leading-zero test inlined as constants"""
+    _check_difficulty(difficulty)
+    # d zero hex digits = d // 2 zero bytes, then a byte below 0x10 when d is odd
+    tests = ["not digest[%d]" % i for i in range(difficulty // 2)]
+    if difficulty % 2:
+        tests.append("digest[%d] < 16" % (difficulty // 2))
+    source = (
+        "def search(prefix_hasher, suffix, start, stride, count):\n"
+        "    for nonce in range(start, start + stride * count, stride):\n"
+        "        h = prefix_hasher.copy()\n"
+        "        h.update(str(nonce).encode() + suffix)\n"
+        "        digest = h.digest()\n"
+        "        if %s:\n"
+        "            return nonce, digest.hex()\n"
+        "    return None\n"
+    ) % (" and ".join(tests) or "True")
+    namespace: Dict[str, Any] = {}
+    exec(compile(source, "<pow difficulty=%d>" % difficulty, "exec"), namespace)
+    return namespace["search"]
+
+def mine(prefix: bytes, suffix: bytes, difficulty: int, start_nonce: int = 0) -> Tuple[int, str]:
+    """Find the first nonce >= start_nonce whose hash has `difficulty` leading zeros"""
+    # hashlib is backed by OpenSSL, which dispatches to the SHA extensions when the CPU has them
+    prefix_hasher = hashlib.sha256(prefix)  # absorb the block-constant bytes once per run
+    # Specialised loops are cached per difficulty, so this only generates code on first use
+    search = _specialized_search(difficulty)
+    nonce = start_nonce
+    while True:
+        result = search(prefix_hasher, suffix, nonce, 1, _SEARCH_BATCH)
+        if result is not None:
+            return result
+        nonce += _SEARCH_BATCH
+
+def _mine_worker(prefix: bytes, suffix: bytes, difficulty: int, start: int, stride: int, found, results):
+    """Search nonces start, start + stride, ... until this or another worker finds a solution"""
+    try:
+        search = _specialized_search(difficulty)
+        prefix_hasher = hashlib.sha256(prefix)
+        nonce = start
+        # Only poll the shared event between batches
+        while not found.is_set():
+            result = search(prefix_hasher, suffix, nonce, stride, _SEARCH_BATCH)
+            if result is not None:
+                found.set()
+                results.put(result)
+                return
+            nonce += stride * _SEARCH_BATCH
+    except Exception as e:
+        # Hand the error to the parent instead of leaving it waiting on the queue
+        found.set()
+        results.put(e)
+
+def _wait_for_result(results, processes, poll: float = 1.0):
+    """First item a mining worker puts on `results`, or RuntimeError if every worker died without one"""
+    while True:
+        try:
+            return results.get(timeout=poll)
+        except queue.Empty:
+            if not any(p.is_alive() for p in processes):
+                break
+    # A worker may have posted just before the last one exited
+    try:
+        return results.get(timeout=poll)
+    except queue.Empty:
+        codes = [p.exitcode for p in processes]
+        raise RuntimeError(f"mining workers exited without a result (exit codes {codes})") from None
+
+def _sha256_hex(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()
+
+def _sha256_many(payloads: List[bytes]) -> List[str]:
+    """Hex SHA-256 of each payload, spreading the ones big enough to drop the GIL over threads"""
+    digests: List[Optional[str]] = [None] * len(payloads)
+    large = [i for i, p in enumerate(payloads) if len(p) >= _GIL_RELEASE_BYTES]
+    if len(large) >= _PARALLEL_VALIDATION_MIN_BLOCKS:
+        with ThreadPoolExecutor() as executor:
+            for i, digest in zip(large, executor.map(_sha256_hex, [payloads[i] for i in large])):
+                digests[i] = digest
+    # Small payloads would only contend for the GIL, so they are hashed inline
+    return [d if d is not None else _sha256_hex(p) for d, p in zip(digests, payloads)]
+
+def _read_last_line(path: Path, chunk_size: int = 4096) -> bytes:
+    """Return the last non-empty line of a file, reading backwards from the end"""
+    with path.open("rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        buf = b""
+        while pos > 0:
+            step = min(chunk_size, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+            lines = buf.rstrip(b"\r\n")
+            if b"\n" in lines:
+                return lines.rsplit(b"\n", 1)[1]
+        return buf.rstrip(b"\r\n")
+
+def _data_path(path: Path) -> Path:
+    """JSONL sidecar holding the per-block data for a saved chain"""
+    return path.with_name(path.stem + ".data.jsonl")
+
 class Block:
+    # No per-instance __dict__: smaller blocks and faster attribute access
+    __slots__ = ("index", "data", "previous_hash", "timestamp", "nonce", "hash")
+
     def __init__(self, index: int, data: Dict[str, Any], previous_hash: str, timestamp: Optional[float] = None):
         self.index = index
         self.data = data
@@ -13,26 +156,96 @@ class Block:
         self.timestamp = timestamp or time.time()
         self.nonce = 0
         self.hash = self.calculate_hash()
-    
+
     def calculate_hash(self) -> str:
         """Calculate SHA-256 hash of the block"""
-        block_string = json.dumps({
-            "index": self.index,
-            "data": self.data,
-            "previous_hash": self.previous_hash,
-            "timestamp": self.timestamp,
-            "nonce": self.nonce
-        }, sort_keys=True)
-        return hashlib.sha256(block_string.encode()).hexdigest()
-
-    def mine_block(self, difficulty: int = 4):
-        """Mine block with proof of work"""
-        target = "0" * difficulty
-        while self.hash[:difficulty] != target:
-            self.nonce += 1
-            self.hash = self.calculate_hash()
+        return hashlib.sha256(self._canonical()).hexdigest()
+
+    def _canonical(self) -> bytes:
+        """Canonical (sorted-key) block JSON that the block hash is taken over"""
+        # Never cached: hashing and validation have to see in-place edits to `data`
+        prefix, suffix = self._split_canonical()
+        return prefix + str(self.nonce).encode() + suffix
+
+    def _split_canonical(self) -> Tuple[bytes, bytes]:
+        """Serialise the block JSON on either side of the nonce value"""
+        # Built field by field so a "nonce" key inside `data` cannot be mistaken for the block's own.
+        # This stays on stdlib json: its separators and ASCII escaping are part of every stored
+        # block hash, and orjson's compact UTF-8 output would change them.
+        prefix = '{"data": %s, "index": %s, "nonce": ' % (
+            json.dumps(self.data, sort_keys=True),
+            json.dumps(self.index)
+        )
+        suffix = ', "previous_hash": %s, "timestamp": %s}' % (
+            json.dumps(self.previous_hash),
+            json.dumps(self.timestamp)
+        )
+        return prefix.encode(), suffix.encode()
+
+    def mine_block(self, difficulty: int = 4, jit: bool = False):
+        """Mine block with proof of work (jit=True uses the Numba search from pow_numba)"""
+        # The split (and, in mine(), its midstate) is computed once per mining run
+        prefix, suffix = self._split_canonical()
+        if jit:
+            numba_mine = _optional_miner("pow_numba", "jit mining", "numba and numpy")
+            result = numba_mine(prefix, suffix, difficulty, self.nonce)
+        else:
+            result = mine(prefix, suffix, difficulty, self.nonce)
+        self._store_mined(*result)
+
+    def mine_block_parallel(self, difficulty: int = 4, workers: Optional[int] = None):
+        """Mine block with proof of work, splitting the nonce space across worker processes"""
+        # The winner is the first solution found, not necessarily the lowest valid nonce
+        _check_difficulty(difficulty)
+        workers = workers or os.cpu_count() or 1
+        prefix, suffix = self._split_canonical()
+        found = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(
+                target=_mine_worker,
+                args=(prefix, suffix, difficulty, self.nonce + i, workers, found, results),
+                daemon=True
+            )
+            for i in range(workers)
+        ]
+        for p in processes:
+            p.start()
+        try:
+            result = _wait_for_result(results, processes)
+        finally:
+            found.set()
+            for p in processes:
+                p.join()
+        if isinstance(result, Exception):
+            raise result
+        self._store_mined(*result)
+
+    def mine_block_cuda(self, difficulty: int = 4):
+        """Mine block with proof of work on a CUDA GPU (see pow_cuda)"""
+        cuda_mine = _optional_miner("pow_cuda", "CUDA mining", "cupy")
+        prefix, suffix = self._split_canonical()
+        self._store_mined(*cuda_mine(prefix, suffix, difficulty, self.nonce))
+
+    def _store_mined(self, nonce: int, block_hash: str):
+        self.nonce = nonce
+        self.hash = block_hash
         print(f"Block mined: {self.hash}")
     
+    @classmethod
+    def _from_stored(cls, d: Dict[str, Any]) -> "Block":
+        """Rebuild a saved block (as from to_dict) without recomputing its hash"""
+        # Skips __init__, which would hash the block only for the stored hash to replace it;
+        # is_chain_valid still checks the stored hash against the stored fields
+        block = object.__new__(cls)
+        block.index = d["index"]
+        block.data = d["data"]
+        block.previous_hash = d["previous_hash"]
+        block.timestamp = d["timestamp"]
+        block.nonce = d["nonce"]
+        block.hash = d["hash"]
+        return block
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             "index": self.index,
@@ -63,7 +276,8 @@ class ETLBlockchain:
     def get_latest_block(self) -> Block:
         return self.chain[-1]
     
-    def add_etl_data_block(self, s1_hash: str, s2_hash: str, dataset_hash: str, etl_metadata: Dict[str, Any] = None):
+    def add_etl_data_block(self, s1_hash: str, s2_hash: str, dataset_hash: str, etl_metadata: Dict[str, Any] = None,
+                           dataset_blake3: Optional[str] = None):
         """Add a new block containing ETL data hashes"""
         data = {
             "type": "etl_data",
@@ -75,6 +289,9 @@ class ETLBlockchain:
             "timestamp_utc": datetime.now(timezone.utc).isoformat(),
             "etl_metadata": etl_metadata or {}
         }
+        if dataset_blake3 is not None:
+            # Internal integrity digest of the dataset; the SHA-256 values above remain the proof
+            data["deterministic_dataset_blake3"] = dataset_blake3
         
         new_block = Block(
             index=len(self.chain),
@@ -85,19 +302,30 @@ class ETLBlockchain:
         self.chain.append(new_block)
         return new_block
     
-    def add_block_from_ledger(self, ledger_path: Path = Path("../ETL_Pipeline/output/ledger.json")):
+    def add_block_from_ledger(self, ledger_path: Path = Path("../ETL_Pipeline/output/ledger.jsonl")):
         """Add block using data from the ETL ledger"""
         if not ledger_path.exists():
             raise FileNotFoundError(f"Ledger file not found: {ledger_path}")
         
-        ledger_data = json.loads(ledger_path.read_text())
-        latest_entry = ledger_data[-1]  # Get the most recent ETL run
+        # Get the most recent ETL run
+        # The format is told by content, not suffix: a ledger.json may already hold JSONL
+        if is_json_array(ledger_path):
+            latest_entry = orjson.loads(ledger_path.read_bytes())[-1]  # legacy JSON-array ledger
+        else:
+            latest_entry = orjson.loads(_read_last_line(ledger_path))
         
         # Extract hashes from ledger
-        extraction_hashes = latest_entry["extraction_hashes"]
-        s1_hash = next(h["sha256"] for h in extraction_hashes if "s1.csv" in h["path"])
-        s2_hash = next(h["sha256"] for h in extraction_hashes if "s2.csv" in h["path"])
+        extraction_hashes = extraction_hashes_by_name(latest_entry["extraction_hashes"])
+        missing = [name for name in ("s1.csv", "s2.csv") if name not in extraction_hashes]
+        if missing:
+            raise ValueError(
+                f"Ledger entry has no extraction hash for {', '.join(missing)} "
+                f"(found: {', '.join(extraction_hashes) or 'none'})"
+            )
+        s1_hash = extraction_hashes["s1.csv"]
+        s2_hash = extraction_hashes["s2.csv"]
         dataset_hash = latest_entry["output"]["deterministic_dataset_sha256"]
+        dataset_blake3 = latest_entry["output"].get("deterministic_dataset_blake3")  # absent on older runs
         
         # Add ETL metadata
         etl_metadata = {
@@ -110,16 +338,19 @@ class ETLBlockchain:
             "etl_timestamp": latest_entry["timestamp_utc"]
         }
         
-        return self.add_etl_data_block(s1_hash, s2_hash, dataset_hash, etl_metadata)
+        return self.add_etl_data_block(s1_hash, s2_hash, dataset_hash, etl_metadata, dataset_blake3)
     
     def is_chain_valid(self) -> bool:
         """Validate the entire blockchain"""
+        # Hash every block up front, re-serialised from its current fields
+        digests = _sha256_many([block._canonical() for block in self.chain[1:]])
+
         for i in range(1, len(self.chain)):
             current_block = self.chain[i]
             previous_block = self.chain[i - 1]
             
             # Check if current block's hash is valid
-            if current_block.hash != current_block.calculate_hash():
+            if current_block.hash != digests[i - 1]:
                 print(f"Invalid hash at block {i}")
                 return False
             
@@ -130,39 +361,92 @@ class ETLBlockchain:
         
         return True
     
-    def save_blockchain(self, path: Path = Path("output/blockchain.json")):
-        """Save blockchain to JSON file"""
+    def save_blockchain(self, path: Path = Path("output/blockchain.npz")):
+        """Save blockchain as column arrays (.npz) with block data in a JSONL sidecar"""
         path.parent.mkdir(parents=True, exist_ok=True)
-        blockchain_data = {
-            "blockchain": [block.to_dict() for block in self.chain],
-            "metadata": {
-                "total_blocks": len(self.chain),
-                "difficulty": self.difficulty,
-                "created_at": datetime.now(timezone.utc).isoformat()
-            }
+        metadata = {
+            "total_blocks": len(self.chain),
+            "difficulty": self.difficulty,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            # The genesis block links to a placeholder rather than a 32-byte hash
+            "genesis_previous_hash": self.chain[0].previous_hash
         }
-        path.write_text(json.dumps(blockchain_data, indent=2))
+        hashes = b"".join(bytes.fromhex(block.hash) for block in self.chain)
+        previous_hashes = bytes(32) + b"".join(bytes.fromhex(block.previous_hash) for block in self.chain[1:])
+        with path.open("wb") as f:
+            np.savez(
+                f,
+                indices=np.array([block.index for block in self.chain], dtype=np.int64),
+                timestamps=np.array([block.timestamp for block in self.chain], dtype=np.float64),
+                # Integer timestamps must reload as ints: "1700000000" and "1700000000.0" hash differently
+                timestamp_is_int=np.array([isinstance(block.timestamp, int) for block in self.chain], dtype=bool),
+                nonces=np.array([block.nonce for block in self.chain], dtype=np.int64),
+                hashes=np.frombuffer(hashes, dtype=np.uint8).reshape(-1, 32),
+                previous_hashes=np.frombuffer(previous_hashes, dtype=np.uint8).reshape(-1, 32),
+                metadata=np.frombuffer(orjson.dumps(metadata), dtype=np.uint8)
+            )
+        with _data_path(path).open("wb") as f:
+            for block in self.chain:
+                f.write(orjson.dumps(block.data) + b"\n")
         print(f"Blockchain saved to: {path.resolve()}")
     
-    def load_blockchain(self, path: Path = Path("output/blockchain.json")):
-        """Load blockchain from JSON file"""
+    def load_blockchain(self, path: Path = Path("output/blockchain.npz")):
+        """Load blockchain saved by save_blockchain (or a legacy .json file)"""
         if not path.exists():
             print(f"Blockchain file not found: {path}")
             return False
         
-        data = json.loads(path.read_text())
-        self.chain = []
-        
-        for block_data in data["blockchain"]:
-            block = Block(
-                index=block_data["index"],
-                data=block_data["data"],
-                previous_hash=block_data["previous_hash"],
-                timestamp=block_data["timestamp"]
-            )
-            block.nonce = block_data["nonce"]
-            block.hash = block_data["hash"]
-            self.chain.append(block)
+        if path.suffix == ".json":
+            stored = orjson.loads(path.read_bytes())["blockchain"]  # legacy single-JSON format
+        else:
+            with np.load(path) as arrays:
+                metadata = orjson.loads(arrays["metadata"].tobytes())
+                with _data_path(path).open("rb") as f:
+                    data = [orjson.loads(line) for line in f]
+                columns = {
+                    name: arrays[name]
+                    for name in ("indices", "timestamps", "nonces", "hashes", "previous_hashes")
+                }
+                # Chains saved before integer timestamps were flagged only ever held floats
+                if "timestamp_is_int" in arrays.files:
+                    columns["timestamp_is_int"] = arrays["timestamp_is_int"]
+                # zip() would quietly drop blocks past the shortest column or a truncated sidecar
+                lengths = {name: len(column) for name, column in columns.items()}
+                lengths["data"] = len(data)
+                if set(lengths.values()) != {metadata["total_blocks"]}:
+                    raise ValueError(
+                        f"Saved blockchain is inconsistent: expected {metadata['total_blocks']} blocks, "
+                        f"got column lengths {lengths}"
+                    )
+                timestamps = columns["timestamps"].tolist()
+                if "timestamp_is_int" in columns:
+                    timestamps = [
+                        int(t) if is_int else t
+                        for t, is_int in zip(timestamps, columns["timestamp_is_int"].tolist())
+                    ]
+                previous_hashes = [row.tobytes().hex() for row in columns["previous_hashes"]]
+                if previous_hashes:
+                    previous_hashes[0] = metadata["genesis_previous_hash"]
+                stored = [
+                    {
+                        "index": index,
+                        "data": block_data,
+                        "previous_hash": previous_hash,
+                        "timestamp": timestamp,
+                        "nonce": nonce,
+                        "hash": block_hash
+                    }
+                    for index, block_data, previous_hash, timestamp, nonce, block_hash in zip(
+                        columns["indices"].tolist(),
+                        data,
+                        previous_hashes,
+                        timestamps,
+                        columns["nonces"].tolist(),
+                        [row.tobytes().hex() for row in columns["hashes"]]
+                    )
+                ]
+
+        self.chain = [Block._from_stored(block_data) for block_data in stored]
         
         print(f"Blockchain loaded from: {path.resolve()}")
         return True
@@ -8,64 +8,167 @@ It still performs transform/load steps and saves an audit ledger.
 """
 from pathlib import Path
 import hashlib
-import json
 from datetime import datetime, timezone
 import argparse
-import io
+import blake3
 import csv
+import re
+from collections import defaultdict
+import numpy as np
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
 from typing import List, Optional, Tuple
 
-def sha256_bytes(b: bytes) -> str:
-    import hashlib
-    return hashlib.sha256(b).hexdigest()
+try:
+    from .ledger import extraction_hashes_by_name, is_json_array
+except ImportError:  # run as a script from ETL_Pipeline/
+    from ledger import extraction_hashes_by_name, is_json_array
+
+_WS_RE = re.compile(r"\s+")
+_COL_RE = re.compile(r"[^0-9a-zA-Z_]")
+# pandas.read_csv's default missing-value markers (pandas._libs.parsers.STR_NA_VALUES)
+_NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
 
 def sha256_file(path: Path, chunk_size: int = 1024*1024) -> str:
-    h = hashlib.sha256()
     with path.open("rb") as f:
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
         for chunk in iter(lambda: f.read(chunk_size), b""):
             h.update(chunk)
     return h.hexdigest()
 
-def read_raw_bytes(path: Path) -> bytes:
-    return path.read_bytes()
-
-def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    cols = (
-        df.columns.str.strip()
-        .str.replace(r"\s+", "_", regex=True)
-        .str.replace(r"[^0-9a-zA-Z_]", "", regex=True)
-        .str.lower()
+def read_csv_table(path: Path) -> pa.Table:
+    # multi-threaded Arrow parser; the same cells pandas.read_csv read as missing become nulls
+    read_options = pacsv.ReadOptions(use_threads=True)
+    tbl = pacsv.read_csv(
+        path,
+        read_options=read_options,
+        convert_options=pacsv.ConvertOptions(null_values=_NA_VALUES, strings_can_be_null=True),
     )
-    df = df.copy()
-    df.columns = cols
-    return df
+    # Arrow infers date/timestamp columns that pandas.read_csv kept as text; re-read those as
+    # strings so that only --date-columns are parsed (and the dataset hash is unchanged)
+    temporal = {f.name: pa.string() for f in tbl.schema if pa.types.is_temporal(f.type)}
+    if temporal:
+        tbl = pacsv.read_csv(
+            path,
+            read_options=read_options,
+            convert_options=pacsv.ConvertOptions(
+                null_values=_NA_VALUES, strings_can_be_null=True, column_types=temporal
+            ),
+        )
+    return tbl.rename_columns(dedupe_names(tbl.column_names))
+
+def dedupe_names(names: List[str]) -> List[str]:
+    # repeated headers get the next free ".1", ".2", ... suffix, as pandas.read_csv mangles them
+    out = list(names)
+    counts = defaultdict(int)
+    for i, name in enumerate(names):
+        count = counts[name]
+        col = name
+        while count > 0:
+            counts[name] = count + 1
+            col = f"{name}.{count}"
+            count = count + 1 if col in out else counts[col]
+        out[i] = col
+        counts[col] = count + 1
+    return out
+
+def normalize_columns(tbl: pa.Table) -> pa.Table:
+    cols = [_COL_RE.sub("", _WS_RE.sub("_", c.strip())).lower() for c in tbl.column_names]
+    return tbl.rename_columns(cols)
+
+def strip_string_cells(tbl: pa.Table) -> pa.Table:
+    for i, field in enumerate(tbl.schema):
+        if pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            tbl = tbl.set_column(i, field.name, pc.utf8_trim_whitespace(tbl.column(i)))
+    return tbl
+
+def to_frame(tbl: pa.Table) -> pd.DataFrame:
+    # split_blocks skips consolidating same-typed columns into one 2-D block (an extra copy);
+    # self_destruct frees each Arrow column once converted, so both never coexist in full.
+    # The table must not be used afterwards.
+    return tbl.to_pandas(split_blocks=True, self_destruct=True)
 
-def strip_string_cells(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    for c in df.select_dtypes(include=["object"]).columns:
-        df[c] = df[c].astype("string").str.strip()
-    return df
+def sort_order(df: pd.DataFrame) -> np.ndarray:
+    # row order sorting by every column, first column primary, missing values first.
+    # Each column is dictionary-encoded with sorted codes (missing = -1) and the codes are
+    # folded into one mixed-radix int64 key, so there is a single stable integer argsort.
+    key = np.zeros(len(df), dtype=np.int64)
+    span = 1
+    for c in df.columns:
+        codes, uniques = pd.factorize(df[c], sort=True)
+        card = len(uniques) + 1
+        if span * card >= 2**63:
+            # re-densify the key (order preserving) before it overflows
+            key, distinct = pd.factorize(key, sort=True)
+            span = len(distinct)
+        key = key * card + (codes + 1)
+        span *= card
+    return np.argsort(key, kind="stable")
 
-def deterministic_csv_bytes(df: pd.DataFrame) -> bytes:
+def write_deterministic_csv(df: pd.DataFrame, output: Path, chunk_rows: int = 100_000) -> Tuple[str, str]:
     # stable column ordering and row sorting
     df_sorted_cols = df.reindex(sorted(df.columns), axis=1)
     sort_cols = list(df_sorted_cols.columns)
     if sort_cols:
-        df_sorted = df_sorted_cols.sort_values(by=sort_cols, kind="mergesort", na_position="first")
+        df_sorted = df_sorted_cols.iloc[sort_order(df_sorted_cols)]
     else:
         df_sorted = df_sorted_cols
     df_out = df_sorted.convert_dtypes()
-    buf = io.StringIO(newline="")
-    df_out.to_csv(buf, index=False, lineterminator="\n", na_rep="", quoting=csv.QUOTE_MINIMAL, date_format="%Y-%m-%dT%H:%M:%S%z")
-    return buf.getvalue().encode("utf-8")
+    # serialise chunk_rows rows at a time straight into the file and both hashers, so the
+    # full CSV is never held in memory; returns (sha256, blake3) hex digests of the bytes.
+    # blake3 is an internal integrity digest only; proof-of-source values stay SHA-256
+    h_sha256 = hashlib.sha256()
+    h_blake3 = blake3.blake3(max_threads=blake3.blake3.AUTO)
+    with output.open("wb") as f:
+        # range(..., max(..., 1)) still writes the header of an empty frame
+        for start in range(0, max(len(df_out), 1), chunk_rows):
+            chunk = df_out.iloc[start:start + chunk_rows].to_csv(
+                None, index=False, header=(start == 0), lineterminator="\n", na_rep="",
+                quoting=csv.QUOTE_MINIMAL, date_format="%Y-%m-%dT%H:%M:%S%z"
+            ).encode("utf-8")
+            f.write(chunk)
+            h_sha256.update(chunk)
+            h_blake3.update(chunk)
+    return h_sha256.hexdigest(), h_blake3.hexdigest()
 
-def etl(csv1: Path, csv2: Path, mode: str="union", join_key: Optional[str]=None, date_columns: Optional[List[str]]=None, output: Path=Path("./output/clean.csv"), ledger: Path=Path("./output/ledger.json")) -> None:
+def migrate_legacy_ledger(ledger: Path) -> None:
+    # one-shot conversion of an old JSON-array ledger into JSONL, so runs can be appended as lines.
+    # The array may be the ledger itself (e.g. --ledger output/ledger.json) or a ledger.json beside it
+    if ledger.exists():
+        legacy = ledger
+    else:
+        legacy = ledger.with_suffix(".json")
+        if not legacy.exists():
+            return
+    if not is_json_array(legacy):
+        return
+    try:
+        entries = orjson.loads(legacy.read_bytes())
+    except orjson.JSONDecodeError:
+        if legacy == ledger:
+            raise  # appending JSONL to it would only bury the damage
+        return
+    # write beside the target and swap in, so a failed conversion leaves the old ledger intact
+    tmp = ledger.with_name(ledger.name + ".tmp")
+    with tmp.open("wb") as f:
+        for entry in entries:
+            entry["extraction_hashes"] = extraction_hashes_by_name(entry["extraction_hashes"])
+            f.write(orjson.dumps(entry) + b"\n")
+    tmp.replace(ledger)
+
+def etl(csv1: Path, csv2: Path, mode: str="union", join_key: Optional[str]=None, date_columns: Optional[List[str]]=None, output: Path=Path("./output/clean.csv"), ledger: Path=Path("./output/ledger.jsonl")) -> None:
     # --- EXTRACT (and immediate extraction-hash generation) ---
-    raw1 = read_raw_bytes(csv1)
-    raw2 = read_raw_bytes(csv2)
-    extraction_hash1 = sha256_bytes(raw1)
-    extraction_hash2 = sha256_bytes(raw2)
+    # stream the raw files through SHA-256 rather than holding their bytes in memory
+    extraction_hash1 = sha256_file(csv1)
+    extraction_hash2 = sha256_file(csv2)
 
     # Print extraction hashes (these are the proof-of-source hashes)
     print("=== EXTRACTION (proof-of-source) ===")
@@ -73,13 +176,11 @@ def etl(csv1: Path, csv2: Path, mode: str="union", join_key: Optional[str]=None,
     print(f"{csv2}: sha256 = {extraction_hash2}")
     print("===================================")
 
-    # load into pandas for transform (we already recorded the raw bytes above)
-    df1 = pd.read_csv(io.BytesIO(raw1))
-    df2 = pd.read_csv(io.BytesIO(raw2))
-
-    # Transform
-    df1 = strip_string_cells(normalize_columns(df1))
-    df2 = strip_string_cells(normalize_columns(df2))
+    # load into Arrow for transform (we already hashed the raw bytes above)
+    # Transform (column/string cleanup in Arrow, then pandas for dates and combine);
+    # the tables are not kept around so to_frame can release them as it converts
+    df1 = to_frame(strip_string_cells(normalize_columns(read_csv_table(csv1))))
+    df2 = to_frame(strip_string_cells(normalize_columns(read_csv_table(csv2))))
     if date_columns:
         for c in date_columns:
             if c in df1.columns:
@@ -97,31 +198,24 @@ def etl(csv1: Path, csv2: Path, mode: str="union", join_key: Optional[str]=None,
 
     df = df.drop_duplicates().reset_index(drop=True)
 
-    # Optionally compute dataset hash (this is NOT the extraction hash)
-    dataset_bytes = deterministic_csv_bytes(df)
-    dataset_hash = sha256_bytes(dataset_bytes)
-
-    # Save deterministic output CSV and ledger
+    # Save deterministic output CSV, hashing it as it is written
+    # (the dataset hash is NOT the extraction hash)
     output.parent.mkdir(parents=True, exist_ok=True)
-    output.write_bytes(dataset_bytes)
+    dataset_hash, dataset_hash_blake3 = write_deterministic_csv(df, output)
 
     # Append to ledger (record extraction hashes explicitly)
     ledger.parent.mkdir(parents=True, exist_ok=True)
-    ledger_entries = []
-    if ledger.exists():
-        try:
-            ledger_entries = json.loads(ledger.read_text())
-        except Exception:
-            ledger_entries = []
+    migrate_legacy_ledger(ledger)
 
     entry = {
         "timestamp_utc": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
         "input_paths": [str(csv1), str(csv2)],
         # **extraction hashes** — produced immediately on extraction of raw bytes
-        "extraction_hashes": [
+        # keyed by file name, or by path if the two inputs share one
+        "extraction_hashes": extraction_hashes_by_name([
             {"path": str(csv1), "sha256": extraction_hash1},
             {"path": str(csv2), "sha256": extraction_hash2},
-        ],
+        ]),
         "etl": {
             "mode": mode,
             "join_key": join_key,
@@ -132,10 +226,12 @@ def etl(csv1: Path, csv2: Path, mode: str="union", join_key: Optional[str]=None,
             "cols": int(df.shape[1]),
             "deterministic_output_path": str(output),
             "deterministic_dataset_sha256": dataset_hash,  # optional separate hash
+            "deterministic_dataset_blake3": dataset_hash_blake3,  # faster integrity cross-check
         }
     }
-    ledger_entries.append(entry)
-    ledger.write_text(json.dumps(ledger_entries, indent=2))
+    # append-only JSONL: one entry per line, earlier runs are never re-read or rewritten
+    with ledger.open("ab") as f:
+        f.write(orjson.dumps(entry) + b"\n")
 
     print("ETL completed. Deterministic output and ledger written.")
     print(f"Deterministic dataset hash (not the extraction-proof): {dataset_hash}")
@@ -152,7 +248,7 @@ def main():
     p.add_argument("--join-key", default=None)
     p.add_argument("--date-columns", nargs="*", default=None)
     p.add_argument("--output", type=Path, default=Path("./output/clean.csv"))
-    p.add_argument("--ledger", type=Path, default=Path("./output/ledger.json"))
+    p.add_argument("--ledger", type=Path, default=Path("./output/ledger.jsonl"))
     args = p.parse_args()
     etl(args.csv1, args.csv2, mode=args.mode, join_key=args.join_key, date_columns=args.date_columns, output=args.output, ledger=args.ledger)
 
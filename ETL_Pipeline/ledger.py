@@ -0,0 +1,28 @@
+"""
+Ledger format helpers shared by the ETL pipeline (writer) and the blockchain (reader).
+
+Kept free of the pandas/pyarrow imports in ETL.py so the blockchain can read ledgers without them.
+"""
+from pathlib import Path
+from typing import Dict, List, Union
+
+
+def extraction_hashes_by_name(hashes: Union[List[dict], Dict[str, str]]) -> Dict[str, str]:
+    # ledger entries map file name -> sha256; older ones store a list of {"path", "sha256"}.
+    # When two inputs share a file name, both are keyed by full path so no proof-of-source hash is lost
+    if not isinstance(hashes, list):
+        return hashes
+    names = [Path(h["path"]).name for h in hashes]
+    if len(set(names)) < len(names):
+        return {h["path"]: h["sha256"] for h in hashes}
+    return {name: h["sha256"] for name, h in zip(names, hashes)}
+
+
+def is_json_array(path: Path) -> bool:
+    # the legacy ledger is one JSON array; the JSONL ledger starts with an object
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(4096), b""):
+            chunk = chunk.lstrip()
+            if chunk:
+                return chunk[:1] == b"["
+    return False
@@ -0,0 +1,161 @@
+import multiprocessing
+
+import orjson
+import pytest
+
+from Blockchain import blockchain
+from Blockchain.blockchain import Block, ETLBlockchain
+
+
+def _chain() -> ETLBlockchain:
+    chain = ETLBlockchain()
+    chain.add_etl_data_block("a" * 64, "b" * 64, "c" * 64)
+    return chain
+
+
+def test_valid_chain():
+    assert _chain().is_chain_valid()
+
+
+def test_in_place_data_edit_is_detected():
+    chain = _chain()
+    chain.chain[1].data["deterministic_dataset_sha256"] = "f" * 64
+    assert not chain.is_chain_valid()
+
+
+def test_nested_data_edit_is_detected():
+    chain = _chain()
+    chain.chain[1].data["etl_metadata"]["k"] = "evil"
+    assert not chain.is_chain_valid()
+
+
+def test_calculate_hash_sees_in_place_edits():
+    block = _chain().chain[1]
+    mined = block.calculate_hash()
+    assert mined == block.hash
+    block.data["etl_metadata"]["k"] = "evil"
+    assert block.calculate_hash() != mined
+
+
+def test_ledger_without_expected_inputs_is_rejected(tmp_path):
+    ledger = tmp_path / "ledger.jsonl"
+    ledger.write_bytes(orjson.dumps({
+        "timestamp_utc": "2024-01-01T00:00:00Z",
+        "input_paths": ["a.csv", "b.csv"],
+        "extraction_hashes": {"a.csv": "a" * 64, "b.csv": "b" * 64},
+        "etl": {},
+        "output": {"rows": 1, "cols": 1, "deterministic_dataset_sha256": "c" * 64},
+    }) + b"\n")
+    with pytest.raises(ValueError, match="s1.csv, s2.csv"):
+        ETLBlockchain().add_block_from_ledger(ledger)
+
+
+def test_difficulty_change_applies_to_new_blocks():
+    chain = ETLBlockchain()
+    chain.difficulty = 5
+    block = chain.add_etl_data_block("a" * 64, "b" * 64, "c" * 64)
+    assert block.hash.startswith("00000")
+
+
+def test_mine_block_parallel():
+    block = Block(1, {"k": "v"}, "0" * 64)
+    block.mine_block_parallel(3, workers=2)
+    assert block.hash.startswith("000")
+    assert block.hash == block.calculate_hash()
+
+
+def test_mine_block_parallel_rejects_bad_difficulty():
+    with pytest.raises(ValueError, match="between 0 and 64"):
+        Block(1, {}, "0" * 64).mine_block_parallel(65, workers=2)
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="workers must inherit the patch")
+def test_mine_block_parallel_raises_worker_errors(monkeypatch):
+    def broken(difficulty):
+        raise ValueError("worker failed")
+
+    monkeypatch.setattr(blockchain, "_specialized_search", broken)
+    with pytest.raises(ValueError, match="worker failed"):
+        Block(1, {}, "0" * 64).mine_block_parallel(3, workers=2)
+
+
+def _ledger_entry(rows: int) -> dict:
+    return {
+        "timestamp_utc": "2024-01-01T00:00:00Z",
+        "input_paths": ["s1.csv", "s2.csv"],
+        "extraction_hashes": {"s1.csv": "1" * 64, "s2.csv": "2" * 64},
+        "etl": {},
+        "output": {"rows": rows, "cols": 1, "deterministic_dataset_sha256": "d" * 64},
+    }
+
+
+@pytest.mark.parametrize("ledger_name", ["ledger.jsonl", "ledger.json"])
+def test_ledger_block_uses_the_last_jsonl_line(tmp_path, ledger_name):
+    ledger = tmp_path / ledger_name
+    # long lines so the backwards read spans several chunks
+    entries = [dict(_ledger_entry(rows), pad="x" * 5000) for rows in (1, 2, 3)]
+    ledger.write_bytes(b"".join(orjson.dumps(e) + b"\n" for e in entries))
+    block = ETLBlockchain().add_block_from_ledger(ledger)
+    assert block.data["etl_metadata"]["output_stats"]["rows"] == 3
+
+
+def test_ledger_block_from_legacy_array(tmp_path):
+    ledger = tmp_path / "ledger.json"
+    ledger.write_bytes(orjson.dumps([_ledger_entry(1), _ledger_entry(2)], option=orjson.OPT_INDENT_2))
+    block = ETLBlockchain().add_block_from_ledger(ledger)
+    assert block.data["etl_metadata"]["output_stats"]["rows"] == 2
+
+
+def test_ledger_entry_with_colliding_names_is_rejected_clearly(tmp_path):
+    ledger = tmp_path / "ledger.json"
+    entry = _ledger_entry(1)
+    entry["extraction_hashes"] = [{"path": "a/s1.csv", "sha256": "1" * 64}, {"path": "b/s1.csv", "sha256": "2" * 64}]
+    ledger.write_bytes(orjson.dumps([entry]))
+    with pytest.raises(ValueError, match="no extraction hash for s1.csv, s2.csv"):
+        ETLBlockchain().add_block_from_ledger(ledger)
+
+
+def _reloaded(chain: ETLBlockchain, path) -> ETLBlockchain:
+    chain.save_blockchain(path)
+    loaded = ETLBlockchain.__new__(ETLBlockchain)
+    assert loaded.load_blockchain(path)
+    return loaded
+
+
+def test_save_load_round_trip(tmp_path):
+    chain = _chain()
+    loaded = _reloaded(chain, tmp_path / "chain.npz")
+    assert [b.to_dict() for b in loaded.chain] == [b.to_dict() for b in chain.chain]
+    assert loaded.is_chain_valid()
+
+
+def test_integer_timestamps_survive_a_round_trip(tmp_path):
+    chain = ETLBlockchain()
+    block = Block(1, {"k": "v"}, chain.chain[0].hash, timestamp=1700000000)
+    block.mine_block(chain.difficulty)
+    chain.chain.append(block)
+    loaded = _reloaded(chain, tmp_path / "chain.npz")
+    assert loaded.chain[1].timestamp == 1700000000
+    assert isinstance(loaded.chain[1].timestamp, int)
+    assert loaded.is_chain_valid()
+
+
+def test_legacy_json_chain_loads(tmp_path):
+    chain = _chain()
+    legacy = tmp_path / "chain.json"
+    legacy.write_bytes(orjson.dumps({"blockchain": [b.to_dict() for b in chain.chain]}))
+    loaded = ETLBlockchain.__new__(ETLBlockchain)
+    assert loaded.load_blockchain(legacy)
+    assert [b.to_dict() for b in loaded.chain] == [b.to_dict() for b in chain.chain]
+    assert loaded.is_chain_valid()
+
+
+def test_truncated_data_sidecar_is_rejected(tmp_path):
+    chain = _chain()
+    chain.add_etl_data_block("d" * 64, "e" * 64, "f" * 64)
+    path = tmp_path / "chain.npz"
+    chain.save_blockchain(path)
+    sidecar = tmp_path / "chain.data.jsonl"
+    sidecar.write_bytes(b"".join(sidecar.read_bytes().splitlines(keepends=True)[:2]))
+    with pytest.raises(ValueError, match="expected 3 blocks"):
+        ETLBlockchain.__new__(ETLBlockchain).load_blockchain(path)
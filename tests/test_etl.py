@@ -0,0 +1,99 @@
+from pathlib import Path
+
+import orjson
+import pytest
+
+from ETL_Pipeline.ETL import etl
+
+
+def _run(tmp_path: Path, s1: str, s2: str, **kwargs) -> bytes:
+    csv1 = tmp_path / "s1.csv"
+    csv2 = tmp_path / "s2.csv"
+    csv1.write_text(s1)
+    csv2.write_text(s2)
+    output = tmp_path / "clean.csv"
+    etl(csv1, csv2, output=output, ledger=tmp_path / "ledger.jsonl", **kwargs)
+    return output.read_bytes()
+
+
+# Expected outputs below are what the original pandas.read_csv pipeline wrote for the same inputs
+
+def test_date_like_strings_stay_text(tmp_path):
+    out = _run(tmp_path, "id,day\n1,2024-01-01\n2,2024-01-02\n", "id,day\n1,2024-01-01\n3,unknown\n")
+    assert out == b"day,id\n2024-01-01,1\n2024-01-02,2\nunknown,3\n"
+    entry = orjson.loads((tmp_path / "ledger.jsonl").read_bytes().splitlines()[-1])
+    assert entry["output"]["rows"] == 3
+
+
+def test_mixed_timestamps_are_not_rewritten(tmp_path):
+    out = _run(tmp_path, "id,seen\n1,2024-01-02 10:00:00\n2,2024-01-04\n", "id,seen\n3, 2024-01-05 \n")
+    assert out == b"id,seen\n1,2024-01-02 10:00:00\n2,2024-01-04\n3,2024-01-05\n"
+
+
+def test_date_columns_are_parsed(tmp_path):
+    out = _run(
+        tmp_path,
+        "id,day\n1,2024-01-01\n2,2024-01-02\n",
+        "id,day\n1,2024-01-01\n3,unknown\n",
+        date_columns=["day"],
+    )
+    assert out == b"day,id\n,3\n2024-01-01T00:00:00+0000,1\n2024-01-02T00:00:00+0000,2\n"
+
+
+def test_inputs_with_the_same_name_keep_both_hashes(tmp_path):
+    paths = []
+    for day, rows in (("day1", "id\n1\n"), ("day2", "id\n2\n")):
+        (tmp_path / day).mkdir()
+        paths.append(tmp_path / day / "data.csv")
+        paths[-1].write_text(rows)
+    etl(*paths, output=tmp_path / "clean.csv", ledger=tmp_path / "ledger.jsonl")
+    entry = orjson.loads((tmp_path / "ledger.jsonl").read_bytes())
+    assert sorted(entry["extraction_hashes"]) == sorted(str(p) for p in paths)
+    assert len(set(entry["extraction_hashes"].values())) == 2
+
+
+def _legacy_entry(n: int) -> dict:
+    return {
+        "timestamp_utc": f"2024-01-0{n}T00:00:00Z",
+        "input_paths": ["in/s1.csv", "in/s2.csv"],
+        "extraction_hashes": [{"path": "in/s1.csv", "sha256": "1" * 64}, {"path": "in/s2.csv", "sha256": "2" * 64}],
+        "etl": {"mode": "union", "join_key": None, "date_columns": []},
+        "output": {"rows": n, "cols": 1, "deterministic_output_path": "clean.csv", "deterministic_dataset_sha256": "d" * 64},
+    }
+
+
+def _ledger_lines(ledger: Path) -> list:
+    return [orjson.loads(line) for line in ledger.read_bytes().splitlines()]
+
+
+@pytest.mark.parametrize("ledger_name", ["ledger.json", "ledger.jsonl"])
+def test_legacy_array_ledger_is_migrated(tmp_path, ledger_name):
+    # the legacy array is either the --ledger path itself or a ledger.json beside a new .jsonl path
+    (tmp_path / "ledger.json").write_bytes(orjson.dumps([_legacy_entry(1), _legacy_entry(2)]))
+    ledger = tmp_path / ledger_name
+    (tmp_path / "s1.csv").write_text("id\n1\n")
+    (tmp_path / "s2.csv").write_text("id\n2\n")
+    etl(tmp_path / "s1.csv", tmp_path / "s2.csv", output=tmp_path / "clean.csv", ledger=ledger)
+
+    entries = _ledger_lines(ledger)
+    assert [e["output"]["rows"] for e in entries] == [1, 2, 2]
+    assert entries[0]["extraction_hashes"] == {"s1.csv": "1" * 64, "s2.csv": "2" * 64}
+
+
+def test_runs_append_to_a_json_named_ledger(tmp_path):
+    ledger = tmp_path / "ledger.json"
+    (tmp_path / "s1.csv").write_text("id\n1\n")
+    (tmp_path / "s2.csv").write_text("id\n2\n")
+    for _ in range(2):
+        etl(tmp_path / "s1.csv", tmp_path / "s2.csv", output=tmp_path / "clean.csv", ledger=ledger)
+    assert len(_ledger_lines(ledger)) == 2
+
+
+def test_pandas_null_markers_are_missing(tmp_path):
+    out = _run(tmp_path, "id,v,n\n3,None,1\n4,x,<NA>\n5,NA,2\n", "id,v,n\n6,null,None\n")
+    assert out == b"id,n,v\n3,1,\n4,,x\n5,2,\n6,,\n"
+
+
+def test_duplicate_headers_are_mangled_like_pandas(tmp_path):
+    out = _run(tmp_path, "a,a,a.1\n1,2,3\n", "a,a,a.1\n4,5,6\n")
+    assert out == b"a,a1,a2\n1,3,2\n4,6,5\n"